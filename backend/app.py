@@ -1,17 +1,19 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from flask_migrate import Migrate, stamp
 from flask_jwt_extended import JWTManager
-from flask_bcrypt import Bcrypt
 from flask_mail import Mail
 from flask_session import Session
 from flask_cors import CORS
 from dotenv import load_dotenv
+import bcrypt as bcrypt_lib
+import click
 import os
+import time
 
 from config import Config
 from models import db
-from routes import routes_bp  # Import the Blueprint from routes.py
+from routes import routes_bp, bcrypt  # Import the Blueprint and shared Bcrypt from routes.py
 
 load_dotenv()
 
@@ -21,20 +23,36 @@ app.config.from_object(Config)
 # Initialize extensions
 Session(app)
 db.init_app(app)
-bcrypt = Bcrypt(app)  # Initialize Bcrypt
+bcrypt.init_app(app)  # Initialize Bcrypt with BCRYPT_LOG_ROUNDS
 jwt = JWTManager(app)
 mail = Mail(app)
 migrate = Migrate(app, db)  # Initialize Flask-Migrate
 
+@app.cli.command("calibrate-bcrypt")
+@click.option("--target-ms", default=100, show_default=True, help="Target hashing time per password.")
+def calibrate_bcrypt(target_ms):
+    """ Finds the highest BCRYPT_LOG_ROUNDS that hashes within the target time on this machine """
+    rounds = 4  # bcrypt minimum
+    while rounds < 31:
+        start = time.perf_counter()
+        bcrypt_lib.hashpw(b"calibration", bcrypt_lib.gensalt(rounds=rounds + 1))
+        if (time.perf_counter() - start) * 1000 > target_ms:
+            break
+        rounds += 1
+    click.echo(f"BCRYPT_LOG_ROUNDS={rounds}")
+
 # CORS settings
 CORS(app, supports_credentials=True, origins=[Config.FRONTEND_URL])
 
 # Register Blueprint for routes
 app.register_blueprint(routes_bp)
 
-# Create database tables
-with app.app_context():
-    db.create_all()
+# Create database tables only when asked (INIT_DB=1); deploys apply the
+# Alembic revisions in migrations/versions with `flask db upgrade`
+if os.getenv("INIT_DB") == "1":
+    with app.app_context():
+        db.create_all()
+        stamp()  # Tables match the latest revision, so later upgrades start from there
 
 # Run the application
 if __name__ == "__main__":
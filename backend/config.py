@@ -16,6 +16,9 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = os.getenv("SQLALCHEMY_TRACK_MODIFICATIONS") == "True"
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     
+    # Password hashing cost (2^rounds iterations); tune with `flask calibrate-bcrypt`
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+
     # Session config
     SESSION_TYPE = os.getenv("SESSION_TYPE", "filesystem")
     SESSION_PERMANENT = False
@@ -88,6 +88,7 @@ class Invoice(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'invoice_number', name='unique_user_invoice_number'),
+        db.Index('ix_invoice_user_status_due', 'user_id', 'status', 'due_date'),  # Overdue sweep
     )
 
     # Relationships
@@ -110,3 +111,8 @@ class InvoiceItem(db.Model):
 
     # Relationships
     invoice = db.relationship('Invoice', back_populates='items')
+
+class InvoiceCounter(db.Model):
+    __tablename__ = 'invoice_counter'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    next_number = db.Column(db.Integer, nullable=False, default=1)  # Next invoice number to hand out
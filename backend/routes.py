@@ -1,25 +1,119 @@
-from flask import Blueprint, request, jsonify, redirect, current_app as app
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask import Blueprint, Response, request, jsonify, redirect, stream_with_context, current_app as app
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
 from flask_bcrypt import Bcrypt
+import atexit
 import secrets
+import orjson
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 import google.auth.transport.requests
 import google.oauth2.id_token
 
-from models import db, User, Client, Invoice, InvoiceItem, PaymentMethod, InvoiceStatus, Currency, ItemType, ItemUnit
+from models import db, User, Client, Invoice, InvoiceItem, InvoiceCounter, PaymentMethod, InvoiceStatus, Currency, ItemType, ItemUnit
 from flask_mail import Message, Mail
 from config import Config
-from datetime import datetime
+from datetime import date, datetime
+from collections import defaultdict
 
-from sqlalchemy.orm import joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 
 bcrypt = Bcrypt()
 mail = Mail()
 
+# Authenticated users cached by token id (jti) to skip the per-request lookup
+_user_cache = TTLCache(maxsize=5000, ttl=30)
+_user_cache_lock = threading.Lock()
+_UNCACHED_USER_FIELDS = {"password", "verification_token"}
+
+# Dialect-specific INSERTs supporting ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# SMTP connection shared across sends to skip the TLS/AUTH handshake each time
+_mail_lock = threading.Lock()
+_mail_connection = None
+
+# Single background worker for outgoing email so requests never wait on SMTP
+mail_executor = ThreadPoolExecutor(max_workers=1)
+
 # Create Blueprint for routes
 routes_bp = Blueprint("routes", __name__)
 
 # -------------------- Helper Functions --------------------
+def _mail_connection_alive(connection) -> bool:
+    """
+    Checks whether the shared SMTP connection can still be used.
+    """
+    if connection.host is None:  # Sending is suppressed (e.g. testing)
+        return True
+    try:
+        return connection.host.noop()[0] == 250
+    except (smtplib.SMTPException, OSError):
+        return False
+
+def _drop_mail_connection():
+    """
+    Closes the shared SMTP connection's socket and forgets it. Call with _mail_lock held.
+    """
+    global _mail_connection
+    if _mail_connection is not None and _mail_connection.host is not None:
+        try:
+            _mail_connection.host.close()
+        except OSError:
+            pass
+    _mail_connection = None
+
+@atexit.register
+def _quit_mail_connection():
+    """
+    Ends the SMTP session politely when the process shuts down.
+    """
+    with _mail_lock:
+        if _mail_connection is not None:
+            try:
+                _mail_connection.__exit__(None, None, None)  # Sends QUIT
+            except (smtplib.SMTPException, OSError):
+                pass
+        _drop_mail_connection()
+
+def send_bulk(messages):
+    """
+    Sends the messages over the shared SMTP connection, reconnecting if it dropped.
+    """
+    global _mail_connection
+    with _mail_lock:
+        if _mail_connection is not None and not _mail_connection_alive(_mail_connection):
+            _drop_mail_connection()
+        if _mail_connection is None:
+            _mail_connection = mail.connect().__enter__()
+        try:
+            for msg in messages:
+                _mail_connection.send(msg)
+        except (smtplib.SMTPException, OSError):
+            _drop_mail_connection()
+            raise
+
+def _send_in_background(flask_app, messages):
+    """
+    Sends the messages from the mail executor, logging any failure instead of raising.
+    """
+    with flask_app.app_context():
+        try:
+            send_bulk(messages)
+        except Exception:
+            # Nothing awaits this job, so make failures visible in the logs
+            flask_app.logger.exception("Failed to send email")
+
+def send_async(messages):
+    """
+    Queues the messages for sending on the background mail worker.
+    """
+    mail_executor.submit(_send_in_background, app._get_current_object(), messages)
+
 def send_verification_email(email: str, token: str):
     """
     Sends an email with a verification link that redirects to the React frontend.
@@ -33,7 +127,7 @@ def send_verification_email(email: str, token: str):
              f"If you did not register, you can safely ignore this email."
     )
 
-    mail.send(msg)
+    send_async([msg])
 
 def send_password_recovery_email(email: str, token: str):
     """
@@ -48,7 +142,70 @@ def send_password_recovery_email(email: str, token: str):
              f"If you did not request a password reset, you can safely ignore this email."
     )
 
-    mail.send(msg)
+    send_async([msg])
+
+def current_user_record():
+    """
+    Returns the User for the JWT of the current request, served from a short-lived
+    cache when the same token was seen recently. Must be called inside @jwt_required.
+    The cache is per process, so other workers may serve profile fields up to the
+    TTL old; credential fields are never cached and always come from the database.
+    """
+    token_id = get_jwt()["jti"]
+    with _user_cache_lock:
+        cached = _user_cache.get(token_id)
+    if cached is not None:
+        # Attach the cached row to this request's session without querying
+        return db.session.merge(cached, load=False)
+
+    user = User.query.filter_by(username=get_jwt_identity()).first()
+    if user:
+        # Cache a detached copy so later requests never share this session's instance.
+        # Credential columns are left out so they load from the database on access.
+        snapshot = User(**{
+            column.key: getattr(user, column.key)
+            for column in User.__table__.columns
+            if column.key not in _UNCACHED_USER_FIELDS
+        })
+        make_transient_to_detached(snapshot)
+        with _user_cache_lock:
+            _user_cache[token_id] = snapshot
+    return user
+
+def invalidate_user_cache(user_id: int):
+    """
+    Drops every cached entry for the given user, e.g. after a credential change.
+    """
+    with _user_cache_lock:
+        for token_id, cached in list(_user_cache.items()):
+            if cached.id == user_id:
+                _user_cache.pop(token_id, None)
+
+def next_invoice_number(user_id: int) -> str:
+    """
+    Allocates the user's next sequential invoice number from their counter row.
+    The UPDATE ... RETURNING is atomic, so concurrent requests never share a number.
+    """
+    allocate = (
+        update(InvoiceCounter)
+        .where(InvoiceCounter.user_id == user_id)
+        .values(next_number=InvoiceCounter.next_number + 1)
+        .returning(InvoiceCounter.next_number)
+        .execution_options(synchronize_session=False)
+    )
+    next_number = db.session.execute(allocate).scalar()
+    if next_number is None:
+        # No counter yet: start right after the user's latest existing invoice
+        last_invoice = Invoice.query.filter_by(user_id=user_id).order_by(Invoice.id.desc()).first()
+        first_number = int(last_invoice.invoice_number) + 1 if last_invoice else 1
+        try:
+            with db.session.begin_nested():
+                db.session.add(InvoiceCounter(user_id=user_id, next_number=first_number + 1))
+            return str(first_number)
+        except IntegrityError:
+            # Another request created the counter first
+            next_number = db.session.execute(allocate).scalar()
+    return str(next_number - 1)
 
 # -------------------- Authentication Routes --------------------
 @routes_bp.route("/register", methods=["POST"])
@@ -67,6 +224,9 @@ def register():
     address = data.get("address")
     tax_number = data.get("tax_number")
 
+    if not username or not password:
+        return jsonify({"message": "Username and password are required"}), 400
+
     # Check if user exists
     if User.query.filter_by(username=username).first():
         return jsonify({"message": "User already exists"}), 400
@@ -134,7 +294,8 @@ def login():
     if not user.is_verified:
         return jsonify({"message": "Email not verified. Please check your inbox."}), 403
 
-    if not bcrypt.check_password_hash(user.password, password):
+    # OAuth users have no local password
+    if not user.password or not bcrypt.check_password_hash(user.password, password):
         return jsonify({"message": "Invalid credentials"}), 401
 
     access_token = create_access_token(identity=username)
@@ -154,15 +315,15 @@ def change_password():
     if not current_password or not new_password:
         return jsonify({"message": "Current password and new password are required"}), 400
 
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
+    user = current_user_record()
 
     if not bcrypt.check_password_hash(user.password, current_password):
         return jsonify({"message": "Current password is incorrect"}), 401
 
-    hashed_new_password = bcrypt.generate_password_hash(new_password).decode("utf-8")
-    user.password = hashed_new_password
+    # Hash in the request so success is only reported once the new password is stored
+    user.password = bcrypt.generate_password_hash(new_password).decode("utf-8")
     db.session.commit()
+    invalidate_user_cache(user.id)
 
     return jsonify({"message": "Password changed successfully"}), 200
 
@@ -209,10 +370,10 @@ def reset_password(token):
         return jsonify({"message": "Passwords do not match."}), 400
 
     # Hash the new password and update the user
-    hashed_new_password = bcrypt.generate_password_hash(new_password).decode("utf-8")
-    user.password = hashed_new_password
+    user.password = bcrypt.generate_password_hash(new_password).decode("utf-8")
     user.verification_token = None  # Clear the token after successful reset
     db.session.commit()
+    invalidate_user_cache(user.id)
 
     return jsonify({"message": "Password reset successful. You can now log in."}), 200
 
@@ -241,9 +402,16 @@ def login_google():
         if not email:
             return jsonify({"error": "Email not provided by Google"}), 400
 
-        # Create or fetch the user, mark as verified automatically (since Google verified)
-        user = User.query.filter_by(username=email).first()
-        if not user:
+        # Create the user unless it exists, mark as verified automatically (since Google verified)
+        upsert_insert = _UPSERT_INSERTS.get(db.engine.dialect.name)
+        if upsert_insert:
+            db.session.execute(
+                upsert_insert(User)
+                .values(username=email, password=None, is_verified=True, name=name, email=email)
+                .on_conflict_do_nothing(index_elements=["username"])
+            )
+            db.session.commit()
+        elif not User.query.filter_by(username=email).first():
             user = User(
                 username=email,
                 password=None,
@@ -275,8 +443,7 @@ def update_email():
     if not new_email:
         return jsonify({"message": "New email is required"}), 400
 
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
+    user = current_user_record()
 
     if User.query.filter_by(username=new_email).first():
         return jsonify({"message": "Email already in use"}), 400
@@ -286,6 +453,7 @@ def update_email():
     verification_token = secrets.token_urlsafe(32)
     user.verification_token = verification_token
     db.session.commit()
+    invalidate_user_cache(user.id)
 
     # Send a verification email to the new email address
     send_verification_email(new_email, verification_token)
@@ -297,8 +465,7 @@ def update_email():
 @jwt_required()
 def get_user_details():
     """ Fetch details of the authenticated user """
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
+    user = current_user_record()
 
     if not user:
         return jsonify({"message": "User not found"}), 404
@@ -327,8 +494,7 @@ def update_user_details():
     address = data.get("address")
     tax_number = data.get("tax_number")
 
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
+    user = current_user_record()
 
     if not user:
         return jsonify({"message": "User not found"}), 404
@@ -341,6 +507,7 @@ def update_user_details():
     user.tax_number = tax_number
 
     db.session.commit()
+    invalidate_user_cache(user.id)
     return jsonify({"message": "User details updated successfully"}), 200
 
 # -------------------- Client Routes --------------------
@@ -348,18 +515,24 @@ def update_user_details():
 @jwt_required()
 def get_clients():
     """ Fetch all clients for the authenticated user """
-    current_user = get_jwt_identity()
-    clients = Client.query.join(User).filter(User.username == current_user).all()
+    user = current_user_record()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
 
-    return jsonify([{
-        "id": client.id,
-        "name": client.name,
-        "business_name": client.business_name,
-        "email": client.email,
-        "phone": client.phone,
-        "address": client.address,
-        "tax_number": client.tax_number  # Include tax_number
-    } for client in clients]), 200
+    # Only select the columns returned to the frontend
+    clients = db.session.execute(
+        select(
+            Client.id,
+            Client.name,
+            Client.business_name,
+            Client.email,
+            Client.phone,
+            Client.address,
+            Client.tax_number,  # Include tax_number
+        ).where(Client.user_id == user.id)
+    ).all()
+
+    return jsonify([dict(client._mapping) for client in clients]), 200
 
 @routes_bp.route("/client", methods=["POST"])
 @jwt_required()
@@ -373,8 +546,7 @@ def create_client():
     address = data.get("address")
     tax_number = data.get("tax_number")  # Include tax_number
 
-    current_user = get_jwt_identity()
-    user_id = User.query.filter_by(username=current_user).first().id
+    user_id = current_user_record().id
 
     client = Client(
         user_id=user_id,
@@ -394,8 +566,7 @@ def create_client():
 @jwt_required()
 def get_client(client_id):
     """ Fetch a single client by ID """
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
+    user = current_user_record()
 
     client = Client.query.filter_by(id=client_id, user_id=user.id).first()
     if not client:
@@ -418,8 +589,7 @@ def update_client(client_id):
     data = request.get_json()
     
     # Get the logged-in user
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
+    user = current_user_record()
 
     # Find the client by ID and ensure it belongs to the user
     client = Client.query.filter_by(id=client_id, user_id=user.id).first()
@@ -444,60 +614,101 @@ def update_client(client_id):
 @jwt_required()
 def get_invoices():
     """ Fetch all invoices for the authenticated user with optimized joins """
-    current_user = get_jwt_identity()
-
-    # Query all invoices for the user joined with the client
-    invoices = Invoice.query.join(User).filter(User.username == current_user).options(joinedload(Invoice.client)).all()
+    user = current_user_record()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+    user_id = user.id  # Read before the commit below expires the user
 
-    # Check due date and update status in the database if overdue
+    # Flag every unpaid invoice past its due date as overdue in a single UPDATE
     today = datetime.today().date()
-    for inv in invoices:
-        # Determine if the invoice is overdue
-        if inv.due_date < today and inv.status == InvoiceStatus.UNPAID:
-            inv.status = InvoiceStatus.OVERDUE
-        
-    # Commit the changes to the database
+    db.session.execute(
+        update(Invoice)
+        .where(
+            Invoice.user_id == user_id,
+            Invoice.due_date < today,
+            Invoice.status == InvoiceStatus.UNPAID,
+        )
+        .values(status=InvoiceStatus.OVERDUE)
+        .execution_options(synchronize_session=False)
+    )
     db.session.commit()
 
-    # Query again to ensure changes are reflected
-    invoices = Invoice.query.join(User).filter(User.username == current_user).options(joinedload(Invoice.client)).all()
-    
-    # Build the response data
-    invoices_data = []
-    for inv in invoices:
-        items = InvoiceItem.query.filter_by(invoice_id=inv.id).all()
-        invoices_data.append({
-            "id": inv.id,
-            "user_id": inv.user_id,
-            "client_id": inv.client_id,
-            "invoice_number": inv.invoice_number,
-            "client": inv.client.name if inv.client else "Unknown",
-            "issue_date": inv.issue_date.strftime("%Y-%m-%d"),
-            "due_date": inv.due_date.strftime("%Y-%m-%d"),
-            "currency": inv.currency.name,
-            "tax_rate": inv.tax_rate,
-            "subtotal": inv.subtotal,
-            "total_discount": inv.total_discount,
-            "tax_amount": inv.tax_amount,
-            "total_amount": inv.total_amount,
-            "status": inv.status.value,  # Convert enum to string
-            "payment_method": inv.payment_method.value,  # Convert enum to string
-            "payment_details": inv.payment_details,
-            "payment_date": inv.payment_date.strftime("%Y-%m-%d") if inv.payment_date else None,
-            "items": [{
-                "id": item.id,
-                "type": item.item_type.value,
-                "description": item.description,
-                "quantity": item.quantity,
-                "unit": item.unit.value,
-                "rate": item.rate,
-                "discount": item.discount,
-                "gross_amount": item.gross_amount,
-                "net_amount": item.net_amount
-            } for item in items]
-        })
-
-    return jsonify(invoices_data), 200
+    # Query only the returned invoice columns for the user joined with the client name
+    invoices = db.session.execute(
+        select(
+            Invoice.id,
+            Invoice.user_id,
+            Invoice.client_id,
+            Invoice.invoice_number,
+            Client.name.label("client_name"),
+            Invoice.issue_date,
+            Invoice.due_date,
+            Invoice.currency,
+            Invoice.tax_rate,
+            Invoice.subtotal,
+            Invoice.total_discount,
+            Invoice.tax_amount,
+            Invoice.total_amount,
+            Invoice.status,
+            Invoice.payment_method,
+            Invoice.payment_details,
+            Invoice.payment_date,
+        )
+        .outerjoin(Client, Invoice.client_id == Client.id)
+        .where(Invoice.user_id == user_id)
+    ).all()
+
+    # Query the items of all those invoices at once and group them per invoice
+    items_by_invoice = defaultdict(list)
+    items = db.session.execute(
+        select(
+            InvoiceItem.invoice_id,
+            InvoiceItem.id,
+            InvoiceItem.item_type,
+            InvoiceItem.description,
+            InvoiceItem.quantity,
+            InvoiceItem.unit,
+            InvoiceItem.rate,
+            InvoiceItem.discount,
+            InvoiceItem.gross_amount,
+            InvoiceItem.net_amount,
+        )
+        .join(Invoice, InvoiceItem.invoice_id == Invoice.id)
+        .where(Invoice.user_id == user_id)
+    ).all()
+    for item in items:
+        items_by_invoice[item.invoice_id].append(item)
+
+    # Build the response data for a single invoice
+    def invoice_data(inv):
+        data = dict(inv._mapping)
+        data["client"] = data.pop("client_name") or "Unknown"
+        data["issue_date"] = inv.issue_date.isoformat()
+        data["due_date"] = inv.due_date.isoformat()
+        data["currency"] = inv.currency.name
+        data["status"] = inv.status.value  # Convert enum to string
+        data["payment_method"] = inv.payment_method.value  # Convert enum to string
+        data["payment_date"] = inv.payment_date.isoformat() if inv.payment_date else None
+        data["items"] = [item_data(item) for item in items_by_invoice[inv.id]]
+        return data
+
+    def item_data(item):
+        data = dict(item._mapping)
+        del data["invoice_id"]  # Only selected for grouping
+        data["type"] = data.pop("item_type").value  # Convert enum to string
+        data["unit"] = item.unit.value  # Convert enum to string
+        return data
+
+    # Stream the response one invoice at a time instead of building the whole list
+    def generate():
+        yield b"["
+        for index, inv in enumerate(invoices):
+            if index:
+                yield b","
+            yield orjson.dumps(invoice_data(inv))
+        yield b"]"
+
+    return Response(stream_with_context(generate()), status=200, mimetype="application/json")
 
 
 @routes_bp.route("/invoice", methods=["POST"])
@@ -522,8 +733,8 @@ def create_invoice():
         return jsonify({"error": "Missing required fields"}), 400
 
     try:
-        issue_date = datetime.strptime(data["issue_date"], "%Y-%m-%d").date()
-        due_date = datetime.strptime(data["due_date"], "%Y-%m-%d").date()
+        issue_date = date.fromisoformat(data["issue_date"])
+        due_date = date.fromisoformat(data["due_date"])
         if due_date < issue_date:
             return jsonify({"error": "Due date cannot be before issue date"}), 400
     except ValueError:
@@ -550,27 +761,22 @@ def create_invoice():
         return jsonify({"error": "Payment details are required"}), 400
 
     # Validate user
-    current_user = get_jwt_identity()
-    user = User.query.filter_by(username=current_user).first()
+    user = current_user_record()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
     # Validate client
-    client = Client.query.get(data["client_id"])
+    client = Client.query.filter_by(id=data["client_id"], user_id=user.id).first()
     if not client:
         return jsonify({"error": "Client not found"}), 404
 
     # Generate sequential invoice number for the user
-    last_invoice = Invoice.query.filter_by(user_id=user.id).order_by(Invoice.id.desc()).first()
-    if last_invoice:
-        last_invoice_number = int(last_invoice.invoice_number)
-        invoice_number = str(last_invoice_number + 1)
-    else:
-        invoice_number = "1"
-
-    # Compute invoice totals
+    invoice_number = next_invoice_number(user.id)
+
+    # Compute invoice totals, keeping each item's amounts for the rows below
     items = data.get("items", [])
     subtotal, total_discount = 0.0, 0.0
+    item_amounts = []
 
     for item in items:
         try:
@@ -582,6 +788,7 @@ def create_invoice():
 
         gross_amount = quantity * rate
         net_amount = gross_amount * (1 - discount / 100)
+        item_amounts.append((quantity, rate, discount, gross_amount, net_amount))
 
         subtotal += gross_amount
         total_discount += gross_amount * (discount / 100)
@@ -615,8 +822,9 @@ def create_invoice():
     db.session.add(invoice)
     db.session.flush()  # Ensure invoice ID is available before adding items
 
-    # Create Invoice Items
-    for item in items:
+    # Collect Invoice Items and insert them in a single statement
+    item_rows = []
+    for item, (quantity, rate, discount, gross_amount, net_amount) in zip(items, item_amounts):
         type_key = item.get("type")
         if not type_key:
             return jsonify({"error": "Item type is required"}), 400
@@ -633,21 +841,20 @@ def create_invoice():
             return jsonify({"error": f"Invalid or missing unit '{unit_key}'"}), 400
         unit_enum = ItemUnit[unit_key]
 
-        gross_amount = float(item["quantity"]) * float(item["rate"])
-        net_amount = gross_amount * (1 - float(item.get("discount", 0.0)) / 100)
-
-        invoice_item = InvoiceItem(
-            invoice_id=invoice.id,
-            item_type=type_enum,
-            description=item["description"],
-            quantity=float(item["quantity"]),
-            unit=unit_enum,
-            rate=float(item["rate"]),
-            discount=float(item.get("discount", 0.0)),
-            gross_amount=gross_amount,
-            net_amount=net_amount,
-        )
-        db.session.add(invoice_item)
+        item_rows.append({
+            "invoice_id": invoice.id,
+            "item_type": type_enum,
+            "description": item["description"],
+            "quantity": quantity,
+            "unit": unit_enum,
+            "rate": rate,
+            "discount": discount,
+            "gross_amount": gross_amount,
+            "net_amount": net_amount,
+        })
+
+    if item_rows:
+        db.session.execute(insert(InvoiceItem), item_rows)
 
     db.session.commit()
     return jsonify({"message": "Invoice created successfully", "invoice_id": invoice.id}), 201
@@ -656,7 +863,11 @@ def create_invoice():
 @jwt_required()
 def get_invoice(invoice_id):
     """ Fetch a single invoice by ID """
-    invoice = Invoice.query.get(invoice_id)
+    user = current_user_record()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+
+    invoice = Invoice.query.filter_by(id=invoice_id, user_id=user.id).first()
     if not invoice:
         return jsonify({"message": "Invoice not found"}), 404
     
@@ -665,9 +876,6 @@ def get_invoice(invoice_id):
     if invoice.due_date < today and invoice.status == InvoiceStatus.UNPAID:
         invoice.status = InvoiceStatus.OVERDUE
         db.session.commit()
-    
-    # Query again to ensure changes are reflected
-    invoice = Invoice.query.get(invoice_id)
 
     # Query the items for the invoice
     items = InvoiceItem.query.filter_by(invoice_id=invoice_id).all()
@@ -678,14 +886,14 @@ def get_invoice(invoice_id):
         "client_id": invoice.client_id,
         "invoice_number": invoice.invoice_number,
         "client": invoice.client.name if invoice.client else "Unknown",
-        "issue_date": invoice.issue_date.strftime("%Y-%m-%d"),
-        "due_date": invoice.due_date.strftime("%Y-%m-%d"),
+        "issue_date": invoice.issue_date.isoformat(),
+        "due_date": invoice.due_date.isoformat(),
         "currency": invoice.currency.name,
         "tax_rate": invoice.tax_rate,
         "status": invoice.status.value,  # Convert enum to string
         "payment_method": invoice.payment_method.value,  # Convert enum to string
         "payment_details": invoice.payment_details,
-        "payment_date": invoice.payment_date.strftime("%Y-%m-%d") if invoice.payment_date else None,
+        "payment_date": invoice.payment_date.isoformat() if invoice.payment_date else None,
         "subtotal": invoice.subtotal,
         "total_discount": invoice.total_discount,
         "tax_amount": invoice.tax_amount,
@@ -708,7 +916,11 @@ def get_invoice(invoice_id):
 @jwt_required()
 def mark_invoice_paid(invoice_id):
     """ Mark an invoice as paid """
-    invoice = Invoice.query.get(invoice_id)
+    user = current_user_record()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+
+    invoice = Invoice.query.filter_by(id=invoice_id, user_id=user.id).first()
     if not invoice:
         return jsonify({"message": "Invoice not found"}), 404
     # invoice.status = "Paid"
@@ -721,7 +933,11 @@ def mark_invoice_paid(invoice_id):
 @jwt_required()
 def cancel_invoice(invoice_id):
     """ Cancel an invoice """
-    invoice = Invoice.query.get(invoice_id)
+    user = current_user_record()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+
+    invoice = Invoice.query.filter_by(id=invoice_id, user_id=user.id).first()
     if not invoice:
         return jsonify({"message": "Invoice not found"}), 404
 